@@ -5,15 +5,18 @@ Optimized for Streamlit Cloud deployment
 """
 
 import streamlit as st
-import folium
-from streamlit_folium import st_folium
+import numpy as np
+import pandas as pd
 import os
 import re
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, time
-from venue_recommender import VenueRecommender
 from dotenv import load_dotenv
 
+# Heavy dependencies (folium, streamlit_folium, requests, VenueRecommender and
+# its transitive openai import) are deferred into the functions that use them
+# so cold start doesn't pay their import cost up front.
+
 # Page configuration
 st.set_page_config(
     page_title="Venue Finder",
@@ -22,10 +25,48 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Load environment variables once at import time (works both locally with .env and on Streamlit Cloud with secrets)
+load_dotenv()
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
+
+# The .env file won't appear or disappear mid-session, so stat it once
+_ENV_FILE_EXISTS = os.path.exists('.env')
+
+# Transport display labels, built once at module scope instead of per rerun
+_TRANSPORT_LABELS = {
+    "Any": "🔄 Any",
+    "driving": "🚗 Driving",
+    "transit": "🚌 Transit",
+    "walking": "🚶 Walking",
+    "bicycling": "🚴 Bicycling"
+}
+_TRANSPORT_FROM_LABEL = {label: mode for mode, label in _TRANSPORT_LABELS.items()}
+
+# Marker styling shared by every venue pin
+_VENUE_ICON_KWARGS = dict(color='red', icon='cutlery')
+
+# Shared HTTP session so geocoding requests reuse pooled TCP/TLS connections
+# instead of re-handshaking with maps.googleapis.com on every call
+_SESSION = None
+
+def _get_session():
+    """Lazily create the shared HTTP session on first geocoding call"""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _SESSION = requests.Session()
+        _SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=8))
+    return _SESSION
+
 def initialize_session_state():
     """Initialize session state variables"""
     if 'recommender' not in st.session_state:
         try:
+            from venue_recommender import VenueRecommender
+
             st.session_state.recommender = VenueRecommender()
         except Exception as e:
             st.error(f"Error initializing venue recommender: {str(e)}")
@@ -37,77 +78,102 @@ def initialize_session_state():
     
     if 'conversation_history' not in st.session_state:
         st.session_state.conversation_history = []
+
+    # Monotonic revision counter - bumped on every history append so derived
+    # values (like the follow-up context) know when to rebuild
+    if 'conv_revision' not in st.session_state:
+        st.session_state.conv_revision = 0
+
+    if 'followup_prefix' not in st.session_state:
+        st.session_state.followup_prefix = ""
+
+    # Rough token budget for conversation history before old turns get summarized
+    if 'history_token_budget' not in st.session_state:
+        st.session_state.history_token_budget = 4000
     
     # Initialize number of users (default to 2)
     if 'num_users' not in st.session_state:
         st.session_state.num_users = 2
+
+    # Entered [location, transport label] rows, kept across group resizes so
+    # ➕/➖ clicks don't wipe what was already typed into the people table
+    if 'people_rows' not in st.session_state:
+        st.session_state.people_rows = []
     
     # Initialize venue locations for map
     if 'venue_locations' not in st.session_state:
         st.session_state.venue_locations = []
 
+# Venue sections start with "## 📍" - compiled once at module load.
+# The Coordinates line is optional; when present it saves a geocoding call.
+_VENUE_RE = re.compile(
+    r'## 📍 (.+?)\n\s*\*\*Address\*\*:\s*(.+?)\n'
+    r'(?:\s*\*\*Coordinates\*\*:\s*(-?[\d.]+),\s*(-?[\d.]+))?',
+    re.DOTALL
+)
+
+@st.cache_data(show_spinner=False)
 def extract_venue_locations(recommendations_text):
-    """Extract venue names and addresses from recommendations text"""
+    """Extract venue names, addresses and optional coordinates from recommendations text"""
     venues = []
-    
-    # Look for venue sections that start with "## 📍"
-    venue_pattern = r'## 📍 (.+?)\n\s*\*\*Address\*\*:\s*(.+?)\n'
-    matches = re.findall(venue_pattern, recommendations_text, re.DOTALL)
-    
-    for name, address in matches:
-        venues.append({
+
+    matches = _VENUE_RE.findall(recommendations_text)
+
+    for name, address, lat, lng in matches:
+        venue = {
             'name': name.strip(),
             'address': address.strip()
-        })
-    
+        }
+        if lat and lng:
+            venue['lat'] = float(lat)
+            venue['lng'] = float(lng)
+        venues.append(venue)
+
     return venues
 
-def create_venue_map(venues=None):
-    """Create a map with venue pins"""
+@st.cache_data(ttl=86400, show_spinner=False)
+def _geocode(address):
+    """Geocode an address with the Google Maps API, cached per address for a day"""
+    if not GOOGLE_MAPS_API_KEY:
+        return None
+
+    try:
+        base_url = "https://maps.googleapis.com/maps/api/geocode/json"
+        params = {
+            "address": address,
+            "key": GOOGLE_MAPS_API_KEY
+        }
+
+        response = _get_session().get(base_url, params=params, timeout=5)
+        data = response.json()
+
+        if data["status"] == "OK" and data["results"]:
+            location = data["results"][0]["geometry"]["location"]
+            return location["lat"], location["lng"]
+    except:
+        pass
+
+    return None
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _build_map(venues_key):
+    """Build a folium map for a fixed set of venues
+
+    venues_key is a tuple of (name, address, lat, lng) tuples so identical
+    venue sets across reruns reuse the same Map object.
+    """
+    import folium
+
     # Default center (London)
     m = folium.Map(location=[51.5074, -0.1278], zoom_start=12)
-    
-    if venues:
-        # Add venue pins
-        for i, venue in enumerate(venues):
-            # Try to get real coordinates if Google Maps API is available
-            load_dotenv()
-            google_maps_api_key = os.getenv("GOOGLE_MAPS_API_KEY")
-            
-            if google_maps_api_key:
-                # Try to geocode the real address
-                try:
-                    base_url = "https://maps.googleapis.com/maps/api/geocode/json"
-                    params = {
-                        "address": venue['address'],
-                        "key": google_maps_api_key
-                    }
-                    
-                    response = requests.get(base_url, params=params, timeout=5)
-                    data = response.json()
-                    
-                    if data["status"] == "OK" and data["results"]:
-                        location = data["results"][0]["geometry"]["location"]
-                        lat = location["lat"]
-                        lng = location["lng"]
-                    else:
-                        # Fallback to approximate coordinates
-                        lat = 51.5074 + (i * 0.01) - 0.02
-                        lng = -0.1278 + (i * 0.01) - 0.02
-                except:
-                    # Fallback to approximate coordinates
-                    lat = 51.5074 + (i * 0.01) - 0.02
-                    lng = -0.1278 + (i * 0.01) - 0.02
-            else:
-                # Use approximate London coordinates with slight offsets
-                lat = 51.5074 + (i * 0.01) - 0.02
-                lng = -0.1278 + (i * 0.01) - 0.02
-            
+
+    if venues_key:
+        for name, address, lat, lng in venues_key:
             folium.Marker(
                 [lat, lng],
-                popup=f"<b>{venue['name']}</b><br>{venue['address']}",
-                tooltip=venue['name'],
-                icon=folium.Icon(color='red', icon='cutlery')
+                popup=f"<b>{name}</b><br>{address}",
+                tooltip=name,
+                icon=folium.Icon(**_VENUE_ICON_KWARGS)
             ).add_to(m)
     else:
         # Add a default marker for demonstration
@@ -117,9 +183,151 @@ def create_venue_map(venues=None):
             tooltip="Click for more info",
             icon=folium.Icon(color='blue', icon='info-sign')
         ).add_to(m)
-    
+
     return m
 
+@st.cache_data(ttl=3600, persist="disk", show_spinner=False)
+def _cached_recommendations(locations, meeting_area, activity, mood, notes, meeting_datetime, transport_preferences):
+    """Content-addressed cache around the LLM recommendation call
+
+    Identical form inputs (accidental double-submits, same-group replans)
+    return the stored response instead of paying the multi-second LLM and
+    Maps round-trips again. On a cache miss the response streams into a
+    placeholder as each venue's travel lookups finish; the placeholder is
+    created in here because containers passed in from outside can't be
+    replayed on cache hits. Only successful documents are cached - error
+    responses raise instead, so a resubmit retries the real call rather
+    than serving a stale failure for the rest of the TTL.
+    """
+    placeholder = st.empty()
+    recommendations = ""
+    for snapshot in st.session_state.recommender.stream_recommendations(
+        locations=list(locations),
+        meeting_area=meeting_area,
+        activity=activity,
+        mood=mood,
+        notes=notes,
+        meeting_datetime=meeting_datetime,
+        transport_preferences=list(transport_preferences)
+    ):
+        recommendations = snapshot
+        placeholder.markdown(snapshot, unsafe_allow_html=True)
+
+    # The results section renders the final document, so clear the
+    # streaming placeholder before handing it back
+    placeholder.empty()
+
+    # The recommender reports failures as "❌ ..." strings rather than
+    # raising; st.cache_data only stores returns, so surface them as an
+    # exception to keep them out of the (disk-persisted) cache - the
+    # submit handler catches it and shows the error
+    if recommendations.startswith("❌"):
+        raise RuntimeError(recommendations.removeprefix("❌").strip())
+
+    return recommendations
+
+def create_venue_map(venues=None):
+    """Create a map with venue pins"""
+    if not venues:
+        return _build_map(())
+
+    def _resolve_coords(venue):
+        # Venues the LLM already pinned skip the geocoding round-trip entirely
+        if 'lat' in venue and 'lng' in venue:
+            return venue['lat'], venue['lng']
+        return _geocode(venue['address'])
+
+    # Resolve all venues in parallel - pure I/O, so threads overlap the HTTP
+    # round-trips (cached and pre-pinned addresses short-circuit)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        all_coords = list(executor.map(_resolve_coords, venues))
+
+    # Approximate central-London fallback coordinates, computed in one
+    # vectorized step with slight offsets so unresolved venues don't stack
+    offsets = np.arange(len(venues)) * 0.01 - 0.02
+    fallback_lats = 51.5074 + offsets
+    fallback_lngs = -0.1278 + offsets
+
+    venues_key = tuple(
+        (venue['name'], venue['address'], *(coords or (fallback_lats[i], fallback_lngs[i])))
+        for i, (venue, coords) in enumerate(zip(venues, all_coords))
+    )
+
+    return _build_map(venues_key)
+
+def _get_followup_context():
+    """Return the follow-up context, memoized on the history revision
+
+    The static recommendation prefix stays byte-identical at the front (so
+    prompt caching keeps applying); earlier follow-up turns are appended
+    after it. The string is only rebuilt when conversation_history has
+    actually changed since the last call.
+    """
+    revision = st.session_state.conv_revision
+    cached = st.session_state.get('_followup_context_cache')
+    if cached and cached[0] == revision:
+        return cached[1]
+
+    context = st.session_state.followup_prefix
+
+    followups = [entry for entry in st.session_state.conversation_history if entry['type'] == 'followup']
+    if followups:
+        turns = "\n\n".join(f"Q: {entry['query']}\nA: {entry['response']}" for entry in followups)
+        context = f"{context}\n\nPREVIOUS FOLLOW-UPS:\n\n{turns}"
+
+    st.session_state._followup_context_cache = (revision, context)
+    return context
+
+def _compact_conversation_history():
+    """Summarize old conversation turns once the history exceeds the token budget
+
+    The most recent turn is always kept verbatim; older responses are replaced
+    with a condensed bullet list (rough 4-chars-per-token estimate), cutting
+    what gets carried into future prompts. Only 'followup' turns are counted
+    and condensed - _get_followup_context rebuilds prompts from the fixed
+    followup_prefix plus follow-up Q/A pairs, so a 'query' entry's response
+    never feeds another prompt and isn't worth paying to summarize.
+    """
+    followups = [entry for entry in st.session_state.conversation_history if entry['type'] == 'followup']
+
+    def estimated_tokens():
+        return sum(len(entry.get('response', '')) for entry in followups) // 4
+
+    for entry in followups[:-1]:
+        if estimated_tokens() <= st.session_state.history_token_budget:
+            break
+        if entry.get('summarized') or not entry.get('response'):
+            continue
+        entry['response'] = st.session_state.recommender.condense_history_entry(entry['response'])
+        entry['summarized'] = True
+
+@st.fragment
+def _render_map_fragment():
+    """Render the venue map column
+
+    Wrapped in st.fragment so st_folium pan/zoom events rerun only this
+    subtree instead of the full script (form, header, env checks).
+    """
+    from streamlit_folium import st_folium
+
+    st.header("📍 Venue Map")
+
+    # Display map with venues if available
+    try:
+        if st.session_state.venue_locations:
+            st.caption(f"🎯 Showing {len(st.session_state.venue_locations)} recommended venues")
+            map_obj = create_venue_map(st.session_state.venue_locations)
+        else:
+            st.caption("Map will show venue pins after recommendations")
+            map_obj = create_venue_map()
+
+        # Nothing reads the interaction return value, so disable the event
+        # channel entirely - pan/zoom no longer ships a state dict back
+        st_folium(map_obj, height=400, width=None, returned_objects=[], key="venue_map")
+    except Exception as e:
+        st.error(f"Error displaying map: {str(e)}")
+        st.info("Map visualization temporarily unavailable")
+
 def main():
     """Main application function"""
     
@@ -130,16 +338,13 @@ def main():
     st.title("📍 Venue Finder")
     st.markdown("*Find perfect meeting spots using AI and Google Maps data*")
     
-    # Load environment variables (works both locally with .env and on Streamlit Cloud with secrets)
-    load_dotenv()
-    
-    # Check if API keys are properly configured
-    openai_key = os.getenv("OPENAI_API_KEY")
-    if not openai_key or len(openai_key) < 20 or '\n' in openai_key:
+    # Check if API keys are properly configured (once per session - the
+    # environment doesn't change mid-session, so later reruns skip this)
+    if 'keys_validated' not in st.session_state and (not OPENAI_API_KEY or len(OPENAI_API_KEY) < 20 or '\n' in OPENAI_API_KEY):
         st.error("🔧 **API Key Configuration Issue**")
         
         # Show different instructions based on deployment environment
-        if os.path.exists('.env'):
+        if _ENV_FILE_EXISTS:
             # Local development - .env file exists but key is wrong
             st.markdown("""
             Your OPENAI_API_KEY appears to be missing or incorrectly formatted. Please:
@@ -173,7 +378,9 @@ def main():
             Create a `.env` file with your API keys.
             """)
         st.stop()
-    
+
+    st.session_state.keys_validated = True
+
     # User management controls (outside form to avoid form resets)
     st.header("👥 Group Size")
     
@@ -246,46 +453,50 @@ def main():
             )
         
         st.divider()
-        
+
+        # Starting locations section - outside the form (like the meeting
+        # area above) so edits sync on every change and a ➕/➖ resize can
+        # reseed the table from what was already typed
+        st.subheader(f"📍 Starting Locations ({st.session_state.num_users} people)")
+
+        # Single editable table instead of per-person widget pairs -
+        # st.data_editor instantiates one widget and diffs edits internally,
+        # where the old loop rebuilt 2 x num_users widgets on every rerun
+        stored_rows = st.session_state.people_rows
+        seed_rows = [
+            [row[0] or "", row[1] if row[1] in _TRANSPORT_FROM_LABEL else _TRANSPORT_LABELS["Any"]]
+            for row in stored_rows[:st.session_state.num_users]
+        ]
+        seed_rows += [["", _TRANSPORT_LABELS["Any"]]] * (st.session_state.num_users - len(seed_rows))
+        people_df = pd.DataFrame(seed_rows, columns=["Location", "Transport"])
+        edited_people = st.data_editor(
+            people_df,
+            num_rows="fixed",
+            use_container_width=True,
+            column_config={
+                "Location": st.column_config.TextColumn(
+                    "Location",
+                    help="Enter a specific address, landmark, or station for best results"
+                ),
+                "Transport": st.column_config.SelectboxColumn(
+                    "Transport",
+                    options=list(_TRANSPORT_LABELS.values()),
+                    required=True,
+                    help="Choose preferred transport or 'Any' if flexible"
+                )
+            },
+            # Keyed per group size: resizing swaps to a fresh widget seeded
+            # from the rows saved below, carrying the entries forward
+            key=f"people_editor_{st.session_state.num_users}"
+        )
+
+        # Save current values for the next resize; rows beyond the current
+        # group size are kept so shrinking then re-adding restores them
+        current_rows = edited_people.fillna("").values.tolist()
+        st.session_state.people_rows = current_rows + stored_rows[len(current_rows):]
+
         # Input form
         with st.form("venue_form"):
-            # Starting locations section
-            st.subheader(f"📍 Starting Locations ({st.session_state.num_users} people)")
-            
-            # Create columns for locations and transport preferences
-            locations = []
-            transport_preferences = []
-            
-            for i in range(st.session_state.num_users):
-                col_loc, col_transport = st.columns([2, 1])
-                
-                with col_loc:
-                    location = st.text_input(
-                        f"Person {i+1} Location",
-                        key=f"location_{i}",
-                        placeholder=f"e.g., London Bridge Station, SE1 9SP",
-                        help="Enter a specific address, landmark, or station for best results"
-                    )
-                    locations.append(location)
-                
-                with col_transport:
-                    transport = st.selectbox(
-                        f"Person {i+1} Transport",
-                        ["Any", "driving", "transit", "walking", "bicycling"],
-                        key=f"transport_{i}",
-                        format_func=lambda x: {
-                            "Any": "🔄 Any",
-                            "driving": "🚗 Driving",
-                            "transit": "🚌 Transit", 
-                            "walking": "🚶 Walking",
-                            "bicycling": "🚴 Bicycling"
-                        }[x],
-                        help="Choose preferred transport or 'Any' if flexible"
-                    )
-                    transport_preferences.append(transport)
-            
-            st.divider()
-            
             # Meeting time section
             st.subheader("⏰ Meeting Time")
             col_date, col_time = st.columns(2)
@@ -335,6 +546,14 @@ def main():
             )
             
             if submitted:
+                # Materialize the per-person lists only on submit - the common
+                # (non-submit) rerun path skips the extraction entirely
+                locations = edited_people["Location"].fillna("").tolist()
+                transport_preferences = [
+                    _TRANSPORT_FROM_LABEL.get(label, "Any")
+                    for label in edited_people["Transport"].fillna(_TRANSPORT_LABELS["Any"])
+                ]
+
                 # Validate inputs - only check the locations for the current number of users
                 valid_locations = [loc for loc in locations[:st.session_state.num_users] if loc.strip()]
                 valid_transport_prefs = transport_preferences[:st.session_state.num_users]
@@ -347,24 +566,40 @@ def main():
                 elif not activity.strip():
                     st.error("Please select or specify an activity.")
                 else:
-                    # Get recommendations
+                    # Get recommendations (streams partial results while fresh
+                    # ones are computed; cache hits return instantly)
                     with st.spinner("🤖 AI is finding the perfect venues for you..."):
                         try:
-                            recommendations = st.session_state.recommender.get_recommendations(
-                                locations=valid_locations,
+                            recommendations = _cached_recommendations(
+                                locations=tuple(valid_locations),
                                 meeting_area=meeting_area if specify_area else None,
                                 activity=activity,
                                 mood=mood,
                                 notes=notes,
                                 meeting_datetime=meeting_datetime,
-                                transport_preferences=valid_transport_prefs
+                                transport_preferences=tuple(valid_transport_prefs)
                             )
                             
                             st.session_state.recommendations = recommendations
-                            
+
                             # Extract venue locations for the map
                             venues = extract_venue_locations(recommendations)
                             st.session_state.venue_locations = venues
+
+                            # Build the follow-up context once per recommendation session.
+                            # Keeping this prefix byte-stable across turns lets OpenAI's
+                            # automatic prompt caching discount the repeated input tokens
+                            # on every follow-up after the first.
+                            st.session_state.followup_prefix = f"""PREVIOUS VENUE RECOMMENDATIONS:
+
+Meeting Details:
+- Locations: {', '.join(valid_locations)}
+- Activity: {activity}
+- Mood: {mood}
+- Meeting Area: {meeting_area if specify_area else "Geographic center"}
+- Date/Time: {meeting_datetime.strftime('%A, %B %d, %Y at %I:%M %p')}
+
+{recommendations}"""
                             
                             st.session_state.conversation_history.append({
                                 'type': 'query',
@@ -377,26 +612,14 @@ def main():
                                 'transport_preferences': valid_transport_prefs,
                                 'response': recommendations
                             })
-                            
+                            st.session_state.conv_revision += 1
+
+
                         except Exception as e:
                             st.error(f"Error getting recommendations: {str(e)}")
 
     with col_map:
-        st.header("📍 Venue Map")
-        
-        # Display map with venues if available
-        try:
-            if st.session_state.venue_locations:
-                st.caption(f"🎯 Showing {len(st.session_state.venue_locations)} recommended venues")
-                map_obj = create_venue_map(st.session_state.venue_locations)
-            else:
-                st.caption("Map will show venue pins after recommendations")
-                map_obj = create_venue_map()
-            
-            map_data = st_folium(map_obj, height=400, width=None)
-        except Exception as e:
-            st.error(f"Error displaying map: {str(e)}")
-            st.info("Map visualization temporarily unavailable")
+        _render_map_fragment()
     
     # Results section (full width)
     if st.session_state.recommendations:
@@ -418,38 +641,11 @@ def main():
             if followup_submitted and followup_query.strip():
                 with st.spinner("🤖 Getting additional information..."):
                     try:
-                        # Create context from conversation history with more details
-                        context = ""
-                        if st.session_state.conversation_history:
-                            last_interaction = st.session_state.conversation_history[-1]
-                            if last_interaction['type'] == 'query':
-                                # Include the full recommendation response for better context
-                                context = f"""PREVIOUS VENUE RECOMMENDATIONS:
-
-Meeting Details:
-- Locations: {', '.join(last_interaction['locations'])}
-- Activity: {last_interaction['activity']}
-- Mood: {last_interaction['mood']}
-- Meeting Area: {last_interaction['meeting_area']}
-- Date/Time: {last_interaction['meeting_datetime'].strftime('%A, %B %d, %Y at %I:%M %p')}
-
-{last_interaction['response']}"""
-                            elif last_interaction['type'] == 'followup':
-                                # If last interaction was a follow-up, get the original recommendations
-                                for interaction in reversed(st.session_state.conversation_history):
-                                    if interaction['type'] == 'query':
-                                        context = f"""PREVIOUS VENUE RECOMMENDATIONS:
+                        # Context = the immutable submit-time prefix plus any earlier
+                        # follow-up turns, memoized on the history revision so it's
+                        # only rebuilt when the history actually changed
+                        context = _get_followup_context()
 
-Meeting Details:
-- Locations: {', '.join(interaction['locations'])}
-- Activity: {interaction['activity']}
-- Mood: {interaction['mood']}
-- Meeting Area: {interaction['meeting_area']}
-- Date/Time: {interaction['meeting_datetime'].strftime('%A, %B %d, %Y at %I:%M %p')}
-
-{interaction['response']}"""
-                                        break
-                        
                         followup_response = st.session_state.recommender.handle_followup_query(
                             query=followup_query,
                             context=context
@@ -464,7 +660,12 @@ Meeting Details:
                             'query': followup_query,
                             'response': followup_response
                         })
-                        
+
+                        # Keep the accumulated history within the token budget
+                        _compact_conversation_history()
+                        st.session_state.conv_revision += 1
+
+
                     except Exception as e:
                         st.error(f"Error processing follow-up: {str(e)}")
 
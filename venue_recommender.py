@@ -4,25 +4,300 @@ Optimized for Streamlit Cloud deployment
 """
 
 import os
+import re
+import json
+import time
+import random
 import asyncio
-import requests
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+import aiohttp
+import numpy as np
+import openai
 import urllib.parse
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+from typing import Dict, Any, Optional, List, AsyncIterator, Iterator
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Optional trailing "lat,lng" pair on a suggested venue line
+_COORDS_RE = re.compile(r"\s*-\s*(-?\d{1,2}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)\s*$")
+
+# "N. Name - Address" suggestion line (numbering optional); one match extracts
+# both fields and rejects malformed lines in the same pass
+_VENUE_LINE_RE = re.compile(r"^\s*(?:\d+\.\s*)?(?P<name>[^\-\n]+?)\s+-\s+(?P<addr>.+?)\s*$")
+
+@dataclass(frozen=True, slots=True)
+class TravelInfo:
+    """Formatted travel details for one person's journey to a venue"""
+    duration: str
+    distance: str
+    route_info: str
+    detailed_steps: tuple
+    departure_time: str
+    arrival_time: str
+    google_maps_link: str
+    raw_duration_seconds: int = 0
+
+# Shared no-route result; only the directions link differs per failure, so
+# failures cost one replace() instead of a fresh 8-field allocation each
+_ERROR_TRAVEL_INFO = TravelInfo(
+    duration="Route not available",
+    distance="Unknown",
+    route_info="Route not found",
+    detailed_steps=(),
+    departure_time="Unknown",
+    arrival_time="Unknown",
+    google_maps_link=""
+)
+
+# Known-good venues used to pad the list when the model under-delivers;
+# same "Name - Address" shape the line parser accepts
+_FALLBACK_VENUES = (
+    "The Hoxton Holborn - 199-206 High Holborn, Holborn, London WC1V 7BD",
+    "Dishoom King's Cross - 5 Stable Street, King's Cross, London N1C 4AB",
+    "The Ivy City Garden - 1 Angel Court, Bank, London EC2R 7HJ",
+    "Sketch - 9 Conduit Street, Mayfair, London W1S 2XG",
+    "Duck & Waffle - 110 Bishopsgate, Liverpool Street, London EC2N 4AY"
+)
+
+# Per-mode display emoji and Google Maps travelmode URL values, hoisted so
+# the 5 x N formatting loop doesn't rebuild them on every iteration
+_TRANSPORT_EMOJI = {"Any": "🔄", "driving": "🚗", "transit": "🚌", "walking": "🚶", "bicycling": "🚴"}
+_MODE_MAP = {
+    "driving": "driving",
+    "transit": "transit",
+    "walking": "walking",
+    "bicycling": "bicycling"
+}
+
 class VenueRecommender:
     """Main class for handling venue recommendations"""
-    
+
+    # LRU/TTL bounds shared by the travel and description caches
+    _CACHE_TTL_SECONDS = 600
+    _CACHE_MAX_ENTRIES = 1024
+
+    # How many venues get rendered in full; the rest are tucked into a
+    # collapsible "see more" block so the viewport shows the best picks first
+    _TOP_K_FULL = 3
+
+    # Prompt templates are built once at import time; per-request values are
+    # dropped in with str.format_map so the branch-heavy fragment assembly
+    # only runs once per (activity, mood) pair (see _prompt_fragments)
+    _VENUE_PROMPT_TMPL = """Based on these starting locations:
+{locations_text}
+
+Meeting requirements:
+- Activity: {activity}
+- Mood/Objective: {mood_vibe}
+- Meeting area: {area}
+{notes_line}
+
+Please suggest EXACTLY 5 specific, high-quality venues that would be excellent for this group{mood_match}.
+
+Consider:
+- Venue quality and reputation
+{activity_consider}
+{mood_consider}
+- Good accessibility for the group
+- {notes_consider}
+
+CRITICAL: You MUST provide exactly 5 venues. Provide ONLY real venue names with proper, complete addresses including street name, area, and postcode, the venue's approximate latitude/longitude, and a 1-2 sentence description of why it suits this group. Do NOT list ranges of numbers or incomplete addresses.
+
+Respond with JSON only, in exactly this shape:
+{{"venues": [{{"name": "The Ivy Chelsea Garden", "address": "197 King's Road, Chelsea, London SW3 5ED", "lat": 51.4865, "lng": -0.1687, "description": "Elegant garden restaurant with a relaxed but polished atmosphere."}}, ...]}}
+
+IMPORTANT: Return ONLY the JSON object with exactly 5 venues, nothing else - no introduction, no explanation. The venues should{mood_final}."""
+
+    _DESC_PROMPT_TMPL = (
+        "In 1-2 sentences, describe why {venue_name} is a good choice{desc_activity}"
+        "{desc_mood}. Consider atmosphere, {desc_food}location, ambiance, "
+        "and{desc_mood_tail}."
+    )
+
+    # Memo for the fragment dicts above - activity/mood come from small
+    # fixed dropdowns, so this stays tiny
+    _FRAG_CACHE: Dict[tuple, Dict[str, str]] = {}
+
     def __init__(self):
-        pass
-        
+        # Persistent event loop on a daemon thread: asyncio.run would spin up
+        # a fresh loop (and fresh TLS connections) on every Streamlit
+        # interaction, so coroutines are driven on this one loop instead and
+        # the OpenAI client / aiohttp session live for the instance's lifetime
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._loop_thread.start()
+
+        # API keys read once instead of an os.getenv per call in the 5 x N
+        # fan-out; missing keys still surface as the friendly "❌" responses
+        # (the UI validates keys before any request reaches this class)
+        self._openai_key = os.getenv("OPENAI_API_KEY")
+        self._gmaps_key = os.getenv("GOOGLE_MAPS_API_KEY")
+
+        # Reused API client and shared aiohttp session for Google Maps calls,
+        # created lazily so the 5 x N fan-out reuses pooled TCP/TLS connections
+        self._openai_client: Optional[openai.AsyncOpenAI] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        # Concurrency limits so the gather fan-out can't burst-hammer either
+        # provider into 429s (created lazily on the loop thread)
+        self._openai_sem: Optional[asyncio.Semaphore] = None
+        self._maps_sem: Optional[asyncio.Semaphore] = None
+
+        # Warm-path caches: tweaking mood or notes doesn't change travel
+        # times, so replans reuse durations (keyed per 5-minute departure
+        # bucket) and descriptions instead of re-paying the API calls
+        self._travel_cache: OrderedDict = OrderedDict()
+        self._desc_cache: OrderedDict = OrderedDict()
+
     async def initialize(self):
         """Initialize method kept for backward compatibility"""
         pass
+
+    def _run(self, coro):
+        """Drive a coroutine to completion on the persistent loop thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def _get_openai_client(self) -> openai.AsyncOpenAI:
+        """Return the shared AsyncOpenAI client, creating it on first use"""
+        if self._openai_client is None:
+            self._openai_client = openai.AsyncOpenAI(api_key=self._openai_key)
+        return self._openai_client
+
+    async def _get_maps_session(self) -> aiohttp.ClientSession:
+        """
+        Lazily create the shared aiohttp session on the loop thread
+
+        The session is bound to the persistent loop, so it (and its pooled
+        TCP/TLS connections) survives across Streamlit interactions. The
+        connector keeps Maps connections warm and caches DNS - every call
+        hits the same googleapis host, so reuse beats fresh handshakes.
+        close() tears the session down at app shutdown.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=64,
+                    limit_per_host=16,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=60
+                ),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._session
+
+    def _cache_get(self, cache: OrderedDict, key: tuple):
+        """Return a live cached value or None (expired entries are dropped)"""
+        entry = cache.get(key)
+        if entry is None:
+            return None
+
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self._CACHE_TTL_SECONDS:
+            del cache[key]
+            return None
+
+        cache.move_to_end(key)
+        return value
+
+    def _cache_put(self, cache: OrderedDict, key: tuple, value) -> None:
+        """Store a value with its timestamp, evicting the oldest entries past the cap"""
+        cache[key] = (time.monotonic(), value)
+        cache.move_to_end(key)
+        while len(cache) > self._CACHE_MAX_ENTRIES:
+            cache.popitem(last=False)
+
+    @classmethod
+    def _prompt_fragments(cls, activity_type: str, mood: Optional[str]) -> Dict[str, str]:
+        """
+        Return the precomputed prompt fragments for an (activity, mood) pair
+
+        Both values come from small fixed dropdowns, so each combination is
+        assembled once and then served from _FRAG_CACHE on every later request.
+        """
+        key = (activity_type, mood)
+        frags = cls._FRAG_CACHE.get(key)
+        if frags is not None:
+            return frags
+
+        flexible_mood = not mood or mood == "Any"
+        mood_lc = mood.lower() if mood else ""
+        activity_lc = activity_type.lower()
+
+        frags = {
+            "activity": "flexible (any type of venue)" if activity_type == "Any" else activity_lc,
+            "mood_vibe": "flexible/open to suggestions" if flexible_mood else mood_lc,
+            "mood_match": " with versatile atmosphere" if flexible_mood
+                else f" AND match the {mood_lc} vibe",
+            "activity_consider": "- Versatility for different types of activities" if activity_type == "Any"
+                else f"- Suitability for {activity_lc}",
+            "mood_consider": "- Flexible atmosphere that works for various moods" if flexible_mood
+                else f"- Perfect match for {mood_lc} atmosphere",
+            "mood_final": " be versatile and work for different preferences" if flexible_mood
+                else f" specifically match the {mood_lc} mood/objective",
+            "desc_activity": " as a versatile venue" if activity_type == "Any"
+                else f" for {activity_lc}",
+            "desc_mood": " that works for various moods" if flexible_mood
+                else f" with a {mood_lc} vibe",
+            "desc_food": "food quality, " if activity_type in ("Restaurant", "Coffee/Cafe", "Any") else "",
+            "desc_mood_tail": " its versatility for different preferences" if flexible_mood
+                else f" how it matches the {mood_lc} mood",
+        }
+        cls._FRAG_CACHE[key] = frags
+        return frags
+
+    def _get_semaphores(self) -> tuple:
+        """
+        Return the (openai, maps) semaphores, created lazily on the loop thread
+        """
+        if self._openai_sem is None:
+            self._openai_sem = asyncio.Semaphore(8)
+            self._maps_sem = asyncio.Semaphore(16)
+        return self._openai_sem, self._maps_sem
+
+    async def _retry(self, coro_factory, sem: asyncio.Semaphore, retries: int = 5):
+        """
+        Run an API call under a concurrency semaphore with exponential backoff
+
+        Retries transient provider failures (rate limits, API errors, network
+        drops) with 2**attempt + jitter sleeps between attempts, preferring
+        the provider's own Retry-After hint when one is exposed. The
+        semaphore is released while sleeping so other requests can proceed;
+        the final failure is raised immediately, without a trailing sleep.
+        """
+        for attempt in range(retries):
+            async with sem:
+                try:
+                    return await coro_factory()
+                except (openai.RateLimitError, openai.APIError, aiohttp.ClientError) as e:
+                    if attempt == retries - 1:
+                        raise
+
+                    delay = min(2 ** attempt + random.random(), 30)
+
+                    # Prefer the provider's own backoff hint when present
+                    headers = getattr(getattr(e, "response", None), "headers", None)
+                    retry_after = headers.get("retry-after") if headers else None
+                    if retry_after:
+                        try:
+                            delay = min(float(retry_after), 30)
+                        except ValueError:
+                            pass
+
+            await asyncio.sleep(delay)
+
+    def close(self):
+        """Close the shared HTTP session and stop the loop thread (call at app shutdown)"""
+        if self._session is not None and not self._session.closed:
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+        self._session = None
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join(timeout=5)
     
     def get_recommendations(
         self,
@@ -49,20 +324,51 @@ class VenueRecommender:
         Returns:
             Formatted recommendations as string
         """
-        # Set default transport preferences if not provided
-        if transport_preferences is None:
-            transport_preferences = ["driving"] * len(locations)
-        
-        # Ensure transport preferences match locations length
-        while len(transport_preferences) < len(locations):
-            transport_preferences.append("driving")
-        
+        # The streaming path does the work; the last snapshot it yields is
+        # the complete ranked document
+        final_response = ""
+        for snapshot in self.stream_recommendations(
+            locations=locations,
+            activity=activity,
+            meeting_area=meeting_area,
+            mood=mood,
+            notes=notes,
+            meeting_datetime=meeting_datetime,
+            transport_preferences=transport_preferences
+        ):
+            final_response = snapshot
+        return final_response
+
+    def stream_recommendations(
+        self,
+        locations: List[str],
+        activity: str,
+        meeting_area: Optional[str] = None,
+        mood: Optional[str] = None,
+        notes: Optional[str] = None,
+        meeting_datetime: Optional[datetime] = None,
+        transport_preferences: Optional[List[str]] = None
+    ) -> Iterator[str]:
+        """
+        Yield progressively complete recommendation documents
+
+        Each item is a full markdown snapshot - the header first, then venue
+        blocks as their travel lookups finish - so the caller can just
+        re-render the latest one. The final item is the same ranked document
+        get_recommendations returns.
+        """
+        # Pad transport preferences to one per person with a single C-level
+        # copy/extend, leaving the caller's list untouched
+        transport_preferences = list(transport_preferences or [])
+        transport_preferences += ["driving"] * (len(locations) - len(transport_preferences))
+
         # Set default meeting time if not provided
         if meeting_datetime is None:
             meeting_datetime = datetime.now()
-        
-        # Use asyncio to run the async function
-        return asyncio.run(self._get_detailed_venue_recommendations_with_real_times(
+
+        # Pull items off the async generator one at a time, each driven on
+        # the persistent loop thread
+        agen = self._stream_recommendations_async(
             locations=locations,
             activity_type=activity,
             transport_preferences=transport_preferences,
@@ -70,9 +376,14 @@ class VenueRecommender:
             meeting_area=meeting_area,
             mood=mood,
             notes=notes
-        ))
-    
-    async def _get_detailed_venue_recommendations_with_real_times(
+        )
+        while True:
+            try:
+                yield self._run(agen.__anext__())
+            except StopAsyncIteration:
+                break
+
+    async def _stream_recommendations_async(
         self,
         locations: List[str],
         activity_type: str,
@@ -81,382 +392,577 @@ class VenueRecommender:
         meeting_area: Optional[str] = None,
         mood: Optional[str] = None,
         notes: Optional[str] = None
-    ) -> str:
+    ) -> AsyncIterator[str]:
         """
         Get venue recommendations with exact travel times from Google Maps API
+
+        Async generator: every item is a complete snapshot of the response so
+        far, so the first venue appears as soon as its Maps lookups return
+        instead of after the slowest one. The last item is the ranked document.
         """
-        
+
         # Check if API key is available
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        if not openai_api_key:
-            return "❌ OPENAI_API_KEY not found in environment variables."
-        
+        if not self._openai_key:
+            yield "❌ OPENAI_API_KEY not found in environment variables."
+            return
+
+        header = f"""# 🎯 Venue Recommendations
+
+**Meeting Details:**
+• **📅 When**: {meeting_datetime.strftime('%A, %B %d, %Y at %I:%M %p')}
+• **🎪 Activity**: {activity_type if activity_type != "Any" else "Any (flexible)"}
+• **🎭 Mood/Objective**: {mood if mood and mood != "Any" else "Any (open to suggestions)"}
+• **👥 Group**: {len(locations)} people
+{"• **📍 Area**: " + meeting_area if meeting_area else "• **🎯 Strategy**: Halfway between all locations"}
+{"• **📝 Notes**: " + notes if notes and notes.strip() else ""}
+"""
+
         try:
-            import openai
-            client = openai.AsyncOpenAI(api_key=openai_api_key)
-            
+            client = self._get_openai_client()
+            yield header + "\n⏳ *Finding venues...*"
+
             # Generate venue suggestions first with enhanced prompt
             locations_text = "\n".join([f"{i+1}. {loc}" for i, loc in enumerate(locations)])
             
-            venue_prompt = f"""Based on these starting locations:
-{locations_text}
+            has_notes = bool(notes and notes.strip())
+            venue_prompt = self._VENUE_PROMPT_TMPL.format_map(dict(
+                self._prompt_fragments(activity_type, mood),
+                locations_text=locations_text,
+                area="in " + meeting_area if meeting_area else " roughly halfway between these locations",
+                notes_line="- Additional notes: " + notes if has_notes else "",
+                notes_consider="Meeting the specific requirements: " + notes if has_notes else ""
+            ))
 
-Meeting requirements:
-- Activity: {activity_type.lower() if activity_type != "Any" else "flexible (any type of venue)"}
-- Mood/Objective: {mood.lower() if mood and mood != "Any" else "flexible/open to suggestions"}
-- Meeting area: {"in " + meeting_area if meeting_area else " roughly halfway between these locations"}
-{"- Additional notes: " + notes if notes and notes.strip() else ""}
+            openai_sem, _ = self._get_semaphores()
+            stream = await self._retry(lambda: client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "You are a local venue expert. Provide exactly 5 specific, real venue recommendations with exact addresses. Be concise and respond with valid JSON following the requested schema exactly."},
+                    {"role": "user", "content": venue_prompt}
+                ],
+                response_format={"type": "json_object"},
+                stream=True,
+                max_tokens=700,
+                temperature=0.1
+            ), openai_sem)
 
-Please suggest EXACTLY 5 specific, high-quality venues that would be excellent for this group{
-    f" AND match the {mood.lower()} vibe" if mood and mood != "Any" else " with versatile atmosphere"
-}. 
+            # Consume the stream, scheduling each venue's processing the moment
+            # its JSON object is complete - travel lookups for the first venue
+            # are already in flight while the model is still writing the last
+            scheduled_venues: List[Dict[str, Any]] = []
+            venue_tasks: List[asyncio.Task] = []
 
-Consider:
-- Venue quality and reputation
-{f"- Suitability for {activity_type.lower()}" if activity_type != "Any" else "- Versatility for different types of activities"}
-{f"- Perfect match for {mood.lower()} atmosphere" if mood and mood != "Any" else "- Flexible atmosphere that works for various moods"}
-- Good accessibility for the group
-- {"Meeting the specific requirements: " + notes if notes and notes.strip() else ""}
+            # URL-encode each origin once per request; every venue's
+            # directions links reuse the same encoded strings
+            q_origins = [urllib.parse.quote_plus(loc) for loc in locations]
 
-CRITICAL: You MUST provide exactly 5 venues. Provide ONLY real venue names with proper, complete addresses including street name, area, and postcode. Do NOT list ranges of numbers or incomplete addresses.
+            def schedule(venue):
+                scheduled_venues.append(venue)
+                venue_tasks.append(asyncio.create_task(self._process_venue(
+                    client=client,
+                    venue=venue,
+                    locations=locations,
+                    q_origins=q_origins,
+                    transport_preferences=transport_preferences,
+                    meeting_datetime=meeting_datetime,
+                    activity_type=activity_type,
+                    mood=mood
+                )))
 
-Provide in this EXACT format (no additional text, just these 5 lines):
-1. [Real Venue Name] - [Number] [Street Name], [Area], [City] [Postcode]
-2. [Real Venue Name] - [Number] [Street Name], [Area], [City] [Postcode]
-3. [Real Venue Name] - [Number] [Street Name], [Area], [City] [Postcode]
-4. [Real Venue Name] - [Number] [Street Name], [Area], [City] [Postcode]
-5. [Real Venue Name] - [Number] [Street Name], [Area], [City] [Postcode]
+            buffer = ""
+            scanned = 0
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                buffer += chunk.choices[0].delta.content or ""
 
-Examples of correct format:
-- The Ivy Chelsea Garden - 197 King's Road, Chelsea, London SW3 5ED
-- Dishoom Covent Garden - 12 Upper St Martin's Lane, Covent Garden, London WC2H 9FB
-- The Shard Restaurant - 31 St Thomas Street, London Bridge, London SE1 9QU
+                complete_objects = self._scan_complete_venues(buffer)
+                for object_src in complete_objects[scanned:]:
+                    scanned += 1
+                    if len(venue_tasks) >= 5:
+                        continue
+                    try:
+                        venue = self._parse_venue_item(json.loads(object_src))
+                    except json.JSONDecodeError:
+                        venue = None
+                    if venue is not None:
+                        schedule(venue)
 
-IMPORTANT: Return ONLY the 5 numbered venue lines, nothing else. No introduction, no explanation, just the 5 venues{
-    f" that specifically match the {mood.lower()} mood/objective" if mood and mood != "Any" else " that are versatile and work for different preferences"
-}."""
+            venue_suggestions = buffer
 
-            response = await client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a local venue expert. Provide exactly 5 specific, real venue recommendations with exact addresses. Be concise and follow the format exactly."},
-                    {"role": "user", "content": venue_prompt}
-                ],
-                max_tokens=600,
-                temperature=0.1
-            )
-            
-            venue_suggestions = response.choices[0].message.content or "No venues found"
-            
-            # Parse venue suggestions to extract addresses
-            venue_lines = [line.strip() for line in venue_suggestions.split('\n') if line.strip() and any(char.isdigit() for char in line)]
-            
-            # Filter out malformed addresses
-            filtered_venue_lines = []
-            for line in venue_lines:
-                # Skip lines with too many numbers (likely malformed addresses)
-                comma_count = line.count(',')
-                number_sequences = len([part for part in line.split() if any(char.isdigit() for char in part)])
-                
-                # Accept only reasonable addresses (not lists of numbers)
-                if comma_count <= 10 and number_sequences <= 8 and len(line) <= 200:
-                    filtered_venue_lines.append(line)
-            
-            # If no valid venues after filtering, use original lines but with warning
-            if not filtered_venue_lines:
-                filtered_venue_lines = venue_lines[:5]
-                
-            # If still no venues, create some fallback recommendations based on location
-            if len(filtered_venue_lines) < 3:
-                fallback_venues = [
-                    "The Hoxton Holborn - 199-206 High Holborn, Holborn, London WC1V 7BD",
-                    "Dishoom King's Cross - 5 Stable Street, King's Cross, London N1C 4AB", 
-                    "The Ivy City Garden - 1 Angel Court, Bank, London EC2R 7HJ",
-                    "Sketch - 9 Conduit Street, Mayfair, London W1S 2XG",
-                    "Duck & Waffle - 110 Bishopsgate, Liverpool Street, London EC2N 4AY"
-                ]
-                
-                # Add fallbacks up to 5 total venues
-                for fallback in fallback_venues:
-                    if len(filtered_venue_lines) >= 5:
+            # If streaming scheduled nothing (e.g. the model ignored the JSON
+            # contract), fall back to parsing numbered "Name - Address" lines;
+            # the compiled regex rejects malformed lines in the same pass
+            if not venue_tasks:
+                for line in venue_suggestions.splitlines():
+                    if len(venue_tasks) >= 5:
                         break
-                    if fallback not in filtered_venue_lines:
-                        filtered_venue_lines.append(fallback)
-            
-            detailed_results = []
-            
-            for venue_line in filtered_venue_lines[:5]:  # Process up to 5 venues
-                # Extract venue name and address
-                if " - " in venue_line:
-                    venue_part = venue_line.split(" - ", 1)[1]
-                    venue_name = venue_line.split(" - ")[0].split(". ", 1)[-1]
-                else:
-                    venue_part = venue_line.split(". ", 1)[1] if ". " in venue_line else venue_line
-                    venue_name = venue_part.split(",")[0]
-                
-                venue_address = venue_part
-                
-                # Get venue description from AI
-                desc_prompt = f"""In 1-2 sentences, describe why {venue_name} is a good choice{
-                    f" for {activity_type.lower()}" if activity_type != "Any" else " as a versatile venue"
-                }{
-                    f" with a {mood.lower()} vibe" if mood and mood != "Any" else " that works for various moods"
-                }. Consider atmosphere, {
-                    "food quality, " if activity_type in ["Restaurant", "Coffee/Cafe"] or activity_type == "Any" else ""
-                }location, ambiance, and{
-                    f" how it matches the {mood.lower()} mood" if mood and mood != "Any" else " its versatility for different preferences"
-                }."""
-                
-                try:
-                    desc_response = await client.chat.completions.create(
-                        model="gpt-4o-mini",
-                        messages=[
-                            {"role": "system", "content": "You are a venue expert. Provide brief, helpful descriptions."},
-                            {"role": "user", "content": desc_prompt}
-                        ],
-                        max_tokens=100,
-                        temperature=0.3
-                    )
-                    venue_description = desc_response.choices[0].message.content or "Great venue for your meetup."
-                except:
-                    venue_description = f"Excellent {activity_type.lower()} venue in a convenient location."
-                
-                # Calculate exact travel times for each person
-                travel_details = []
-                total_duration_seconds = 0
-                max_duration_seconds = 0
-                
-                for i, (location, transport) in enumerate(zip(locations, transport_preferences)):
-                    # Handle "Any" transport mode by using the most efficient option (driving)
-                    actual_transport = transport if transport != "Any" else "driving"
-                    
-                    travel_info = await self._get_travel_time_and_route(
-                        origin=location,
-                        destination=venue_address,
-                        mode=actual_transport,
-                        departure_time=meeting_datetime
-                    )
-                    
-                    person_number = i + 1  # 1, 2, 3, 4
-                    transport_emoji = {"Any": "🔄", "driving": "🚗", "transit": "🚌", "walking": "🚶", "bicycling": "🚴"}
-                    emoji = transport_emoji.get(transport, "🚗")
-                    
-                    # Format travel detail for each person on separate lines
-                    transport_display = f"{transport.title()}" if transport != "Any" else f"Any (using {actual_transport.title()})"
-                    travel_detail = f"• **Person {person_number}** ({emoji} {transport_display}): Leave at {travel_info['departure_time']} • Journey time: {travel_info['duration']} • <a href='{travel_info['google_maps_link']}' target='_blank'>Get directions</a>"
-                    
-                    travel_details.append(travel_detail)
-                    
-                    # Add to total time and track max time (for fairness ranking)
-                    if 'raw_duration_seconds' in travel_info:
-                        duration = travel_info['raw_duration_seconds']
-                        total_duration_seconds += duration
-                        max_duration_seconds = max(max_duration_seconds, duration)
-                
-                # Calculate average travel time
-                avg_time_minutes = total_duration_seconds // len(locations) // 60 if total_duration_seconds > 0 else 0
-                max_time_minutes = max_duration_seconds // 60 if max_duration_seconds > 0 else 0
-                
-                # Calculate suitability score (lower is better)
-                suitability_score = (max_duration_seconds * 1.5) + total_duration_seconds
-                
-                # Format venue recommendation with all information
-                venue_recommendation = f"""
-## 📍 {venue_name}
+                    parsed_line = self._parse_venue_line(line)
+                    if parsed_line is not None:
+                        schedule(parsed_line)
 
-**Address**: {venue_address}
+            # If still too few venues, pad with known-good fallback recommendations
+            if len(venue_tasks) < 3:
+                # Add fallbacks up to 5 total venues, skipping names the
+                # model already suggested (set lookup, not a list scan)
+                seen_names = {venue["name"] for venue in scheduled_venues}
+                for fallback in _FALLBACK_VENUES:
+                    if len(venue_tasks) >= 5:
+                        break
+                    parsed_fallback = self._parse_venue_line(fallback)
+                    if parsed_fallback is not None and parsed_fallback["name"] not in seen_names:
+                        seen_names.add(parsed_fallback["name"])
+                        schedule(parsed_fallback)
 
-**Why this venue**: {venue_description}
+            # Re-render a snapshot as each venue block lands instead of
+            # blocking on the slowest journey lookup
+            detailed_results = []
+            pending = set(venue_tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    detailed_results.append(task.result())
+                blocks = "\n\n".join(result[1] for result in detailed_results)
+                if pending:
+                    plural = "s" if len(pending) > 1 else ""
+                    yield f"{header}\n{blocks}\n\n⏳ *{len(pending)} more option{plural} on the way...*"
 
-**🚶‍♂️ Travel Details:**  
-{('<br>'.join(travel_details))}
+            # Rank venues by suitability score (best first) with one argsort
+            # over the score vector instead of a Python comparison sort
+            scores = np.array([result[0] for result in detailed_results])
+            order = np.argsort(scores, kind="stable")
 
-**📊 Summary**: Average {avg_time_minutes} mins • Longest journey {max_time_minutes} mins
+            top_blocks = [detailed_results[i][1] for i in order[:self._TOP_K_FULL]]
+            extra_blocks = [detailed_results[i][1] for i in order[self._TOP_K_FULL:]]
 
----
+            # The best venues render in full; runners-up collapse behind a
+            # "see more" toggle (the markdown is shown with unsafe_allow_html)
+            venues_text = "\n\n".join(top_blocks)
+            if extra_blocks:
+                extra_text = "\n\n".join(extra_blocks)
+                plural = "s" if len(extra_blocks) > 1 else ""
+                venues_text += (
+                    f"\n\n<details>\n<summary>🔽 See {len(extra_blocks)} more option{plural}</summary>\n\n"
+                    f"{extra_text}\n\n</details>"
+                )
 
-"""
-                detailed_results.append((suitability_score, venue_recommendation))
-            
-            # Sort venues by suitability score (best first)
-            detailed_results.sort(key=lambda x: x[0])
-            
             # Format final response
-            final_response = f"""# 🎯 Venue Recommendations
-
-**Meeting Details:**
-• **📅 When**: {meeting_datetime.strftime('%A, %B %d, %Y at %I:%M %p')}
-• **🎪 Activity**: {activity_type if activity_type != "Any" else "Any (flexible)"}
-• **🎭 Mood/Objective**: {mood if mood and mood != "Any" else "Any (open to suggestions)"}
-• **👥 Group**: {len(locations)} people
-{"• **📍 Area**: " + meeting_area if meeting_area else "• **🎯 Strategy**: Halfway between all locations"}
-{"• **📝 Notes**: " + notes if notes and notes.strip() else ""}
-
-{('\n\n'.join([result[1] for result in detailed_results]))}
+            final_response = f"""{header}
+{venues_text}
 
 💡 **Tips**: Venues ranked by convenience and fairness. All times calculated to arrive by {meeting_datetime.strftime('%I:%M %p')}. {
-    f"Venues selected to match your {mood.lower()} vibe!" if mood and mood != "Any" 
+    f"Venues selected to match your {mood.lower()} vibe!" if mood and mood != "Any"
     else "Versatile venues selected to accommodate different preferences!"
 }
 """
-            
-            return final_response
-            
+
+            yield final_response
+
         except Exception as e:
-            return f"❌ Error getting detailed recommendations: {str(e)}"
+            yield f"❌ Error getting detailed recommendations: {str(e)}"
 
-    async def _get_travel_time_and_route(
-        self,
-        origin: str, 
-        destination: str, 
-        mode: str,
-        departure_time: Optional[datetime] = None
-    ) -> Dict[str, Any]:
+    def _parse_venue_line(self, venue_line: str) -> Optional[Dict[str, Any]]:
         """
-        Get exact travel time and detailed route information using Google Maps API
+        Parse one "N. Name - Address[ - lat,lng]" line in a single regex pass
+
+        Returns None for lines that don't fit the shape, which also replaces
+        the old digit/comma-counting malformed-address heuristics.
         """
-        google_maps_api_key = os.getenv("GOOGLE_MAPS_API_KEY")
-        
-        if not google_maps_api_key:
-            return {
-                "duration": "API key not available",
-                "distance": "Unknown",
-                "route_info": "Google Maps API key required for real-time data",
-                "detailed_steps": [],
-                "departure_time": "Unknown",
-                "arrival_time": "Unknown",
-                "google_maps_link": self._generate_google_maps_link(origin, destination, mode)
-            }
-        
+        match = _VENUE_LINE_RE.match(venue_line)
+        if match is None:
+            return None
+
+        venue_name = match.group("name").strip()
+        venue_address = match.group("addr").strip()
+
+        # Pull the optional "lat,lng" pair off the end of the line so the
+        # map can skip geocoding venues the model already pinned
+        venue_coords = None
+        coords_match = _COORDS_RE.search(venue_address)
+        if coords_match:
+            venue_coords = (float(coords_match.group(1)), float(coords_match.group(2)))
+            venue_address = venue_address[:coords_match.start()].strip()
+
+        return {
+            "name": venue_name,
+            "address": venue_address,
+            "coords": venue_coords,
+            "description": None
+        }
+
+    def _parse_venue_item(self, item) -> Optional[Dict[str, Any]]:
+        """
+        Validate one JSON venue object into the parsed-venue shape, or None
+        """
+        if not isinstance(item, dict):
+            return None
+
+        venue_name = (item.get("name") or "").strip()
+        venue_address = (item.get("address") or "").strip()
+        if not venue_name or not venue_address:
+            return None
+
+        venue_coords = None
         try:
-            # Google Maps Directions API
-            base_url = "https://maps.googleapis.com/maps/api/directions/json"
-            
-            # Map our transport modes to Google's
-            google_mode_map = {
-                "driving": "driving",
-                "transit": "transit", 
-                "walking": "walking",
-                "bicycling": "bicycling"
-            }
-            
+            if item.get("lat") is not None and item.get("lng") is not None:
+                venue_coords = (float(item["lat"]), float(item["lng"]))
+        except (TypeError, ValueError):
+            pass
+
+        return {
+            "name": venue_name,
+            "address": venue_address,
+            "coords": venue_coords,
+            "description": (item.get("description") or "").strip() or None
+        }
+
+    @staticmethod
+    def _scan_complete_venues(buffer: str) -> List[str]:
+        """
+        Return the JSON source of every complete venue object in the buffer
+
+        The streamed response is {"venues": [{...}, {...}, ...]}, so complete
+        venue objects are the balanced depth-2 {...} spans. Braces inside JSON
+        strings are ignored. The buffer is at most a few KB, so re-scanning it
+        per chunk is cheap.
+        """
+        objects = []
+        depth = 0
+        in_string = False
+        escaped = False
+        start = None
+
+        for i, char in enumerate(buffer):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                continue
+
+            if char == '"':
+                in_string = True
+            elif char == '{':
+                depth += 1
+                if depth == 2:
+                    start = i
+            elif char == '}':
+                if depth == 2 and start is not None:
+                    objects.append(buffer[start:i + 1])
+                    start = None
+                depth -= 1
+
+        return objects
+
+    async def _fetch_duration_matrix(
+        self,
+        locations: List[str],
+        transport_preferences: List[str],
+        destinations: List[str],
+        departure_time: datetime
+    ) -> np.ndarray:
+        """
+        Fetch a (people x venues) travel-time matrix in seconds
+
+        Groups people by transport mode and issues one Distance Matrix request
+        per distinct mode with pipe-joined origins/destinations, instead of a
+        Directions call per (person, venue) pair. Entries are NaN where no
+        route was found (or the API key is missing).
+        """
+        durations = np.full((len(locations), len(destinations)), np.nan)
+
+        if not self._gmaps_key or not destinations:
+            return durations
+
+        # Handle "Any" transport mode by using the most efficient option (driving)
+        mode_groups: Dict[str, List[int]] = {}
+        for i, transport in enumerate(transport_preferences):
+            actual_transport = transport if transport != "Any" else "driving"
+            mode_groups.setdefault(actual_transport, []).append(i)
+
+        # Durations barely move within a few minutes, so cache per 5-minute
+        # departure bucket
+        bucket = int(departure_time.timestamp() // 300) if departure_time else 0
+
+        async def fetch_mode(mode, rows):
+            # Serve whatever we can from the travel cache; skip the HTTP call
+            # entirely when every pair for this mode is warm
+            missing = False
+            for i in rows:
+                for j, destination in enumerate(destinations):
+                    cached = self._cache_get(self._travel_cache, (locations[i], destination, mode, bucket))
+                    if cached is not None:
+                        durations[i, j] = cached
+                    else:
+                        missing = True
+            if not missing:
+                return
+
+            base_url = "https://maps.googleapis.com/maps/api/distancematrix/json"
+
             params = {
-                "origin": origin,
-                "destination": destination,
-                "mode": google_mode_map.get(mode, "driving"),
-                "key": google_maps_api_key,
+                "origins": "|".join(locations[i] for i in rows),
+                "destinations": "|".join(destinations),
+                "mode": mode,
+                "key": self._gmaps_key,
                 "units": "metric"
             }
-            
+
             # Add departure time for transit and driving (for traffic)
             if departure_time and mode in ["transit", "driving"]:
-                # Convert to Unix timestamp
-                timestamp = int(departure_time.timestamp())
-                params["departure_time"] = str(timestamp)
-            
-            # Add alternatives for better route options
-            if mode == "transit":
-                params["alternatives"] = "true"
-            
-            response = requests.get(base_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data["status"] == "OK" and data["routes"]:
-                route = data["routes"][0]  # Take the first route
-                leg = route["legs"][0]     # Take the first leg
-                
-                # Extract duration and distance
-                duration_text = leg["duration"]["text"]
-                distance_text = leg["distance"]["text"]
-                duration_seconds = leg["duration"]["value"]
-                
-                # Calculate departure and arrival times
-                if departure_time:
-                    # Meeting time is the arrival time
-                    arrival_time = departure_time
-                    # Calculate when they need to leave (meeting time minus travel duration)
-                    departure_time_calc = datetime.fromtimestamp(departure_time.timestamp() - duration_seconds)
-                else:
-                    # Default case
-                    arrival_time = datetime.now()
-                    departure_time_calc = datetime.fromtimestamp(arrival_time.timestamp() - duration_seconds)
-                
-                # Generate Google Maps link with specific transportation mode
-                google_maps_link = self._generate_google_maps_link(origin, destination, mode)
-                
-                return {
-                    "duration": duration_text,
-                    "distance": distance_text,
-                    "route_info": f"{duration_text} via {mode}",
-                    "detailed_steps": [],
-                    "departure_time": departure_time_calc.strftime("%I:%M %p"),
-                    "arrival_time": arrival_time.strftime("%I:%M %p") if arrival_time else "Unknown",
-                    "google_maps_link": google_maps_link,
-                    "raw_duration_seconds": duration_seconds
-                }
-            else:
-                error_msg = data.get("error_message", "Route not found")
-                return {
-                    "duration": "Route not available",
-                    "distance": "Unknown", 
-                    "route_info": f"Error: {error_msg}",
-                    "detailed_steps": [],
-                    "departure_time": "Unknown",
-                    "arrival_time": "Unknown",
-                    "google_maps_link": self._generate_google_maps_link(origin, destination, mode)
-                }
-                
-        except Exception as e:
-            return {
-                "duration": "Error calculating time",
-                "distance": "Unknown",
-                "route_info": f"API Error: {str(e)}",
-                "detailed_steps": [],
-                "departure_time": "Unknown", 
-                "arrival_time": "Unknown",
-                "google_maps_link": self._generate_google_maps_link(origin, destination, mode)
-            }
+                params["departure_time"] = str(int(departure_time.timestamp()))
 
-    def _generate_google_maps_link(self, origin: str, destination: str, mode: str) -> str:
-        """Generate a Google Maps link with specific transportation mode"""
-        
-        # Map our modes to Google Maps URL parameters
-        mode_map = {
-            "driving": "driving",
-            "transit": "transit",
-            "walking": "walking", 
-            "bicycling": "bicycling"
-        }
-        
-        google_mode = mode_map.get(mode, "driving")
-        
-        # Encode the addresses for URL
-        origin_encoded = urllib.parse.quote_plus(origin)
-        destination_encoded = urllib.parse.quote_plus(destination)
-        
-        # Build Google Maps URL with working format
-        return f"https://www.google.com/maps/dir/{origin_encoded}/{destination_encoded}/@?hl=en&travelmode={google_mode}"
+            async def do_request():
+                session = await self._get_maps_session()
+                async with session.get(base_url, params=params) as response:
+                    response.raise_for_status()
+                    return await response.json()
+
+            try:
+                _, maps_sem = self._get_semaphores()
+                data = await self._retry(do_request, maps_sem)
+
+                if data.get("status") != "OK":
+                    return
+
+                for r, i in enumerate(rows):
+                    for j, element in enumerate(data["rows"][r]["elements"]):
+                        if element.get("status") == "OK":
+                            durations[i, j] = element["duration"]["value"]
+                            self._cache_put(
+                                self._travel_cache,
+                                (locations[i], destinations[j], mode, bucket),
+                                element["duration"]["value"]
+                            )
+            except:
+                # Leave this mode's rows as NaN; the formatter reports them
+                pass
+
+        await asyncio.gather(*[fetch_mode(mode, rows) for mode, rows in mode_groups.items()])
+
+        return durations
+
+    async def _process_venue(
+        self,
+        client,
+        venue: Dict[str, Any],
+        locations: List[str],
+        q_origins: List[str],
+        transport_preferences: List[str],
+        meeting_datetime: datetime,
+        activity_type: str,
+        mood: Optional[str] = None
+    ) -> tuple:
+        """
+        Build one venue's recommendation block, fetching its travel durations
+        (and a description when the fused call didn't supply one)
+
+        q_origins are the URL-encoded locations, shared across all venues.
+        """
+        venue_name = venue["name"]
+        venue_address = venue["address"]
+        venue_coords = venue["coords"]
+
+        # Encode the destination once; each person's link reuses it
+        q_dest = urllib.parse.quote_plus(venue_address)
+
+        # Fetch this venue's travel durations right away - scheduled mid-stream,
+        # this overlaps the Maps I/O with the model still generating
+        durations = await self._fetch_duration_matrix(
+            locations=locations,
+            transport_preferences=transport_preferences,
+            destinations=[venue_address],
+            departure_time=meeting_datetime
+        )
+        venue_durations = durations[:, 0]
+
+        # The fused suggestion call already provides a description for most
+        # venues; only fallback entries need a separate request, and those go
+        # through the (venue, activity, mood) cache first
+        venue_description = venue.get("description")
+        desc_key = (venue_name, activity_type, mood)
+        if venue_description is None:
+            venue_description = self._cache_get(self._desc_cache, desc_key)
+
+        if venue_description is None:
+            # Get venue description from AI
+            desc_prompt = self._DESC_PROMPT_TMPL.format_map(dict(
+                self._prompt_fragments(activity_type, mood),
+                venue_name=venue_name
+            ))
+
+            try:
+                openai_sem, _ = self._get_semaphores()
+                desc_response = await self._retry(lambda: client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": "You are a venue expert. Provide brief, helpful descriptions."},
+                        {"role": "user", "content": desc_prompt}
+                    ],
+                    max_tokens=100,
+                    temperature=0.3
+                ), openai_sem)
+                venue_description = desc_response.choices[0].message.content or "Great venue for your meetup."
+                self._cache_put(self._desc_cache, desc_key, venue_description)
+            except:
+                venue_description = f"Excellent {activity_type.lower()} venue in a convenient location."
+
+        # Aggregate travel times with nan-aware numpy reductions - missing
+        # routes are NaN in the matrix and simply drop out of the totals
+        has_route = ~np.isnan(venue_durations)
+        total_duration_seconds = int(venue_durations[has_route].sum()) if has_route.any() else 0
+        max_duration_seconds = int(venue_durations[has_route].max()) if has_route.any() else 0
+
+        avg_time_minutes = total_duration_seconds // len(locations) // 60 if total_duration_seconds > 0 else 0
+        max_time_minutes = max_duration_seconds // 60 if max_duration_seconds > 0 else 0
+
+        # Calculate suitability score (lower is better)
+        suitability_score = (max_duration_seconds * 1.5) + total_duration_seconds
+
+        # Format travel details for each person from the precomputed durations
+        travel_details = []
+
+        for i, transport in enumerate(transport_preferences):
+            actual_transport = transport if transport != "Any" else "driving"
+
+            duration_seconds = venue_durations[i]
+            travel_info = self._build_travel_info(
+                q_origin=q_origins[i],
+                q_dest=q_dest,
+                mode=actual_transport,
+                departure_time=meeting_datetime,
+                duration_seconds=None if np.isnan(duration_seconds) else int(duration_seconds)
+            )
+
+            person_number = i + 1  # 1, 2, 3, 4
+            emoji = _TRANSPORT_EMOJI.get(transport, "🚗")
+
+            # Format travel detail for each person on separate lines
+            transport_display = f"{transport.title()}" if transport != "Any" else f"Any (using {actual_transport.title()})"
+            travel_detail = f"• **Person {person_number}** ({emoji} {transport_display}): Leave at {travel_info.departure_time} • Journey time: {travel_info.duration} • <a href='{travel_info.google_maps_link}' target='_blank'>Get directions</a>"
+
+            travel_details.append(travel_detail)
+
+        # Format venue recommendation with all information
+        coords_line = f"**Coordinates**: {venue_coords[0]},{venue_coords[1]}\n\n" if venue_coords else ""
+        travel_details_text = '<br>'.join(travel_details)
+        venue_recommendation = f"""
+## 📍 {venue_name}
+
+**Address**: {venue_address}
+
+{coords_line}**Why this venue**: {venue_description}
+
+**🚶‍♂️ Travel Details:**  
+{travel_details_text}
+
+**📊 Summary**: Average {avg_time_minutes} mins • Longest journey {max_time_minutes} mins
+
+---
+
+"""
+        return (suitability_score, venue_recommendation)
+
+    def _build_travel_info(
+        self,
+        q_origin: str,
+        q_dest: str,
+        mode: str,
+        departure_time: Optional[datetime],
+        duration_seconds: Optional[int]
+    ) -> TravelInfo:
+        """
+        Format one person's travel details from a precomputed duration
+
+        Pure formatter - all Maps HTTP happens up front in
+        _fetch_duration_matrix. q_origin/q_dest arrive already URL-encoded;
+        duration_seconds is None when no route (or no API key) was available.
+        """
+        if duration_seconds is None:
+            return replace(_ERROR_TRAVEL_INFO, google_maps_link=self._build_link(q_origin, q_dest, mode))
+
+        # Calculate departure and arrival times
+        if departure_time:
+            # Meeting time is the arrival time
+            arrival_time = departure_time
+        else:
+            arrival_time = datetime.now()
+
+        # Calculate when they need to leave (meeting time minus travel duration)
+        departure_time_calc = arrival_time - timedelta(seconds=duration_seconds)
+
+        hours, minutes = divmod(duration_seconds // 60, 60)
+        duration_text = f"{hours} hour{'s' if hours != 1 else ''} {minutes} mins" if hours else f"{minutes} mins"
+
+        return TravelInfo(
+            duration=duration_text,
+            distance="Unknown",
+            route_info=f"{duration_text} via {mode}",
+            detailed_steps=(),
+            departure_time=departure_time_calc.strftime("%I:%M %p"),
+            arrival_time=arrival_time.strftime("%I:%M %p"),
+            google_maps_link=self._build_link(q_origin, q_dest, mode),
+            raw_duration_seconds=duration_seconds
+        )
+
+    @staticmethod
+    def _build_link(q_origin: str, q_dest: str, mode: str) -> str:
+        """Build a Google Maps directions link from pre-encoded addresses"""
+        google_mode = _MODE_MAP.get(mode, "driving")
+        return f"https://www.google.com/maps/dir/{q_origin}/{q_dest}/@?hl=en&travelmode={google_mode}"
     
+    def condense_history_entry(self, text: str) -> str:
+        """
+        Condense an old conversation turn into a short bullet summary
+        """
+        return self._run(self._condense_history_entry_async(text))
+
+    async def _condense_history_entry_async(self, text: str) -> str:
+        """
+        Internal async method for condensing conversation history
+        """
+        if not self._openai_key:
+            return text
+
+        try:
+            client = self._get_openai_client()
+
+            openai_sem, _ = self._get_semaphores()
+            response = await self._retry(lambda: client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "You summarize venue recommendation conversations. Keep venue names, addresses and key travel facts; drop everything else."},
+                    {"role": "user", "content": f"Condense the following into a short bullet list, preserving venue names, addresses and travel times:\n\n{text}"}
+                ],
+                max_tokens=300,
+                temperature=0.1
+            ), openai_sem)
+
+            return response.choices[0].message.content or text
+
+        except:
+            # Keep the original text if summarization fails
+            return text
+
     def handle_followup_query(self, query: str, context: str = "") -> str:
         """
         Handle follow-up questions using async processing
         """
-        return asyncio.run(self._handle_followup_async(query, context))
+        return self._run(self._handle_followup_async(query, context))
     
     async def _handle_followup_async(self, query: str, context: str = "") -> str:
         """
         Internal async method for handling follow-up questions
         """
         # Check if API key is available
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        if not openai_api_key:
+        if not self._openai_key:
             return "❌ OPENAI_API_KEY not found. Please check your .env file configuration."
         
         try:
             # Use direct OpenAI API for follow-up questions
-            import openai
-            client = openai.AsyncOpenAI(api_key=openai_api_key)
+            client = self._get_openai_client()
             
             # Improved prompt that emphasizes using the context
             system_prompt = """You are a venue finder assistant helping with follow-up questions about previously recommended venues. 
@@ -491,7 +997,8 @@ Question: {query}
 
 I need the original venue recommendations to give you a specific answer about which venues would be good for your request. Could you please ask for new venue recommendations first?"""
             
-            response = await client.chat.completions.create(
+            openai_sem, _ = self._get_semaphores()
+            response = await self._retry(lambda: client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -499,7 +1006,7 @@ I need the original venue recommendations to give you a specific answer about wh
                 ],
                 max_tokens=800,
                 temperature=0.3
-            )
+            ), openai_sem)
             
             return response.choices[0].message.content or "No response received from API"
                 